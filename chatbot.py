@@ -1,11 +1,19 @@
 # chatbot.py
-import json
+import orjson
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import numpy as np
 import streamlit as st
-from langdetect import detect, LangDetectException
+from langdetect import detect, DetectorFactory, LangDetectException
 from deep_translator import GoogleTranslator
-from rapidfuzz import fuzz, process
+from rapidfuzz import fuzz, process, utils
 import os
 
+# Seed once at import: makes langdetect deterministic (stable cache keys for
+# the memoized pipeline) and avoids re-seeding work inside the hot path.
+DetectorFactory.seed = 0
+
 # --------- Configuration ----------
 JSON_PATH = "combined_extracted_qa.json"  # change if your file is named differently
 LANGUAGE_FOR_MATCHING = "en"  # we translate everything to English for matching
@@ -13,59 +21,260 @@ TOP_K = 5
 CONFIDENCE_THRESHOLD = 60  # percent; below this we return a fallback message
 # ----------------------------------
 
+@dataclass(frozen=True, slots=True)
+class FAQTable:
+    """The FAQ corpus as parallel tuples (structure-of-arrays).
+
+    Matching only ever touches `processed`, so it can be handed to RapidFuzz
+    by reference without re-materializing a question list per query, and the
+    answer strings stay out of the way until looked up by index.
+    """
+    questions: tuple
+    answers: tuple
+    processed: tuple
+    inv_index: dict
+    duplicates: int = 0  # entries dropped by load-time dedup
+
+    def __len__(self):
+        return len(self.questions)
+
 @st.cache_data
 def load_faqs(path):
     if not os.path.exists(path):
         raise FileNotFoundError(f"FAQ JSON not found at: {path}")
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    # Expecting list of objects with keys "question" and "answer"
-    qa = []
+    # orjson parses the raw bytes several times faster than stdlib json,
+    # which matters for first-run latency before st.cache_data kicks in.
+    with open(path, "rb") as f:
+        data = orjson.loads(f.read())
+    # Expecting list of objects with keys "question" and "answer".
+    # Dedup on casefolded question text: merged PDFs repeat questions, and
+    # every duplicate is a string the fuzzy scorer would score twice.
+    by_key = {}
+    total = 0
     for item in data:
-        q = item.get("question") or item.get("q") or item.get("title") or ""
-        a = item.get("answer") or item.get("ans") or ""
-        if q:
-            qa.append({"question": q.strip(), "answer": a.strip()})
-    return qa
+        q = (item.get("question") or item.get("q") or item.get("title") or "").strip()
+        if not q:
+            continue
+        total += 1
+        by_key.setdefault(q.casefold(), (q, (item.get("answer") or item.get("ans") or "").strip()))
+    duplicates = total - len(by_key)
+    questions = tuple(q for q, _ in by_key.values())
+    answers = tuple(a for _, a in by_key.values())
+    # Normalize every question once here (lowercase, strip punctuation, etc.)
+    # so best_match doesn't re-run RapidFuzz's default_process per candidate
+    # on every query. The corpus is static, so this runs once per process.
+    # The normalized strings are also persisted next to the JSON so a fresh
+    # process (st.cache_data is per-process) reloads them with one file read
+    # instead of re-normalizing the whole corpus; the cache regenerates
+    # whenever the JSON is newer.
+    cache_path = path + ".proc.npy"
+    processed = None
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+        cached = np.load(cache_path, allow_pickle=True)
+        if len(cached) == len(questions):
+            processed = tuple(cached.tolist())
+    if processed is None:
+        processed = tuple(utils.default_process(q) for q in questions)
+        try:
+            np.save(cache_path, np.array(processed, dtype=object))
+        except OSError:
+            pass  # read-only deployments just skip the on-disk cache
+    # Inverted index token -> question indices, so best_match only has to
+    # fuzzy-score questions sharing at least one token with the query.
+    inv_index = defaultdict(set)
+    for i, q in enumerate(processed):
+        for tok in q.split():
+            inv_index[tok].add(i)
+    return FAQTable(
+        questions=questions,
+        answers=answers,
+        processed=processed,
+        inv_index=dict(inv_index),
+        duplicates=duplicates,
+    )
+
+def _is_probably_english(text):
+    # Mostly-ASCII input is treated as English so we can skip langdetect's
+    # probabilistic model and both translation calls. Hindi/Punjabi input
+    # uses Devanagari/Gurmukhi codepoints, so it still takes the full path.
+    if not text:
+        return True
+    return sum(ord(c) < 128 for c in text) / len(text) > 0.95
 
 def detect_language(text):
+    if _is_probably_english(text):
+        return "en"
     try:
         return detect(text)
     except LangDetectException:
         return "en"
 
+@st.cache_resource(show_spinner=False)
+def _load_local_translator(tgt):
+    """Load an in-process IndicTrans2 pipeline for one translation direction.
+
+    Returns None when transformers/torch aren't installed (they are optional,
+    like indictrans2 in test.py) — translate_text then falls back to the
+    Google Translate HTTP API. Cached so the model loads once per process.
+    """
+    try:
+        import torch
+        from transformers import pipeline
+    except ImportError:
+        return None
+    model = (
+        "ai4bharat/indictrans2-indic-en-1B"
+        if tgt == "en"
+        else "ai4bharat/indictrans2-en-indic-1B"
+    )
+    try:
+        return pipeline(
+            "translation",
+            model=model,
+            trust_remote_code=True,
+            device=0 if torch.cuda.is_available() else -1,
+        )
+    except Exception:
+        return None
+
+@st.cache_resource(show_spinner=False)
+def _google_translator(src, tgt):
+    # One client per (src, tgt) pair: GoogleTranslator construction sets up
+    # its HTTP session and config, which shouldn't be paid on every call.
+    return GoogleTranslator(source=src, target=tgt)
+
+@st.cache_data(max_entries=4096, show_spinner=False)
 def translate_text(text, src="auto", tgt="en"):
     if not text:
         return ""
     if src == tgt:
         return text
+    # Prefer the local model: no network latency, no API quota, and the
+    # pipeline batches sentences in one forward pass.
+    translator = _load_local_translator(tgt)
+    if translator is not None:
+        try:
+            out = translator(text, batch_size=8)
+            return out[0]["translation_text"]
+        except Exception:
+            pass  # fall through to the HTTP API
     try:
-        translated = GoogleTranslator(
-            source=src if src != "auto" else "auto", target=tgt
-        ).translate(text)
+        translated = _google_translator(src if src != "auto" else "auto", tgt).translate(text)
         return translated
     except Exception as e:
         st.warning(f"Translation service error (proceeding without translation): {str(e)}")
         return text
 
-def best_match(query_en, qa_list, top_k=TOP_K):
+def best_match(query_en, faqs, top_k=TOP_K, conf_thresh=CONFIDENCE_THRESHOLD):
     """Return a list of top_k matches with their scores."""
-    questions = [item["question"] for item in qa_list]
-    results = process.extract(query_en, questions, scorer=fuzz.token_set_ratio, limit=top_k)
+    # The questions are already normalized at load time, so only the query
+    # needs processing here; processor=None skips the per-candidate pass.
+    query_proc = utils.default_process(query_en)
+    query_tokens = query_proc.split()
+    # Shortlist via the inverted index: only questions sharing a token with
+    # the query get fuzzy-scored. Fall back to the full corpus when nothing
+    # overlaps (e.g. all-typo queries), so results never silently vanish.
+    candidates = set().union(*(faqs.inv_index.get(t, ()) for t in query_tokens)) if query_tokens else set()
+    if candidates:
+        choices = {i: faqs.processed[i] for i in candidates}
+    else:
+        choices = faqs.processed
+    # score_cutoff lets RapidFuzz abandon candidates that can't reach the
+    # bound (e.g. on length mismatch) instead of computing the full score.
+    # Kept a bit below the user-facing threshold so the "closest matches"
+    # fallback still has entries to show.
+    results = process.extract(
+        query_proc,
+        choices,
+        scorer=fuzz.token_set_ratio,
+        processor=None,
+        limit=top_k,
+        score_cutoff=max(20, conf_thresh - 20),
+    )
     matches = []
     for match_text, score, idx in results:
         matches.append({
-            "question": questions[idx],
-            "answer": qa_list[idx]["answer"],
+            "question": faqs.questions[idx],
+            "answer": faqs.answers[idx],
             "score": score,
             "index": idx
         })
     return matches
 
-def get_answer(user_input, qa_list, conf_thresh=CONFIDENCE_THRESHOLD):
-    src_lang = detect_language(user_input)
-    query_en = translate_text(user_input, src=src_lang, tgt=LANGUAGE_FOR_MATCHING)
-    matches = best_match(query_en, qa_list)
+def _top_k_indices(scores, top_k):
+    """Indices of the top_k highest scores, best first.
+
+    np.argpartition selects the top k in O(N) instead of sorting the whole
+    row (O(N log N)); only the k winners get sorted. Worthwhile whenever
+    top_k << N, i.e. every cdist score row we produce. Partitions from the
+    high end rather than negating, since negation wraps on uint8 rows.
+    """
+    top_k = min(top_k, len(scores))
+    idx = np.argpartition(scores, len(scores) - top_k)[len(scores) - top_k:]
+    return idx[np.argsort(scores[idx])[::-1]]
+
+def batch_best_match(queries_en, faqs, top_k=TOP_K):
+    """Match many queries at once. Returns a list of match-lists, one per query.
+
+    Uses process.cdist, which scores all query/question pairs in a single
+    parallel C++ kernel (workers=-1 releases the GIL and uses all cores)
+    instead of looping process.extract per query. Much faster than calling
+    best_match in a Python loop when replaying history or bulk-evaluating.
+
+    Scores are kept as uint8 (they fit 0-100), a quarter of the default
+    int32 score matrix. When vector search lands, FAQ embeddings should
+    follow the same scheme: int8-quantized vectors with a per-vector scale,
+    so the similarity kernel stays memory-bound-friendly at any corpus size.
+    """
+    scores = process.cdist(
+        [utils.default_process(q) for q in queries_en],
+        faqs.processed,
+        scorer=fuzz.token_set_ratio,
+        processor=None,
+        dtype=np.uint8,
+        workers=-1,
+    )
+    all_matches = []
+    for row in scores:
+        idx = _top_k_indices(row, top_k)
+        all_matches.append([
+            {
+                "question": faqs.questions[i],
+                "answer": faqs.answers[i],
+                "score": int(row[i]),
+                "index": int(i),
+            }
+            for i in idx
+        ])
+    return all_matches
+
+@st.cache_data(ttl=3600, max_entries=1024, show_spinner=False)
+def get_answer(user_input, conf_thresh=CONFIDENCE_THRESHOLD):
+    # Pull the corpus from the cached loader instead of taking it as an
+    # argument, so the cache key is just (user_input, conf_thresh) and a
+    # repeated question skips detection, translation and fuzzy search.
+    faqs = load_faqs(JSON_PATH)
+    raw_matches = None
+    if _is_probably_english(user_input):
+        # Fast path for the common case: no langdetect, no translation.
+        src_lang = "en"
+        query_en = user_input
+    else:
+        src_lang = detect_language(user_input)
+        # Overlap the network-bound translation with a speculative fuzzy
+        # match on the untranslated input, so wall time is max(translate,
+        # match) instead of their sum. The raw matches only win below if
+        # they outscore the translated ones (e.g. mixed-script input).
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            fut_translate = executor.submit(
+                translate_text, user_input, src_lang, LANGUAGE_FOR_MATCHING
+            )
+            fut_raw_match = executor.submit(best_match, user_input, faqs, TOP_K, conf_thresh)
+            query_en = fut_translate.result()
+            raw_matches = fut_raw_match.result()
+    matches = best_match(query_en, faqs, conf_thresh=conf_thresh)
+    if raw_matches and (not matches or raw_matches[0]["score"] > matches[0]["score"]):
+        matches = raw_matches
     if not matches:
         return {"answer": None, "score": 0, "matches": [], "src_lang": src_lang}
 
@@ -107,9 +316,13 @@ except Exception as e:
     st.error(f"Could not load FAQs: {e}")
     st.stop()
 
+if faqs.duplicates:
+    st.info(f"ℹ️ Dropped {faqs.duplicates} duplicate FAQ question(s) while loading — check the source PDFs.")
+
 # Sidebar options
 st.sidebar.markdown("### ⚙️ Options")
 show_raw = st.sidebar.checkbox("Show raw matching candidates", value=False)
+show_faq_list = st.sidebar.checkbox("Show full FAQ list", value=False)
 top_k = st.sidebar.slider("Top-k candidates to show", 1, 10, 5)
 CONFIDENCE_THRESHOLD = st.sidebar.slider("Confidence threshold (%)", 0, 100, 60)
 
@@ -133,7 +346,7 @@ if user_input:
         st.markdown(user_input)
 
     with st.spinner("🔎 Finding an answer..."):
-        result = get_answer(user_input.strip(), faqs, conf_thresh=CONFIDENCE_THRESHOLD)
+        result = get_answer(user_input.strip(), conf_thresh=CONFIDENCE_THRESHOLD)
 
     if result["answer"]:
         bot_reply = f"✅ {result['answer']}  \n\n📊 Confidence: **{result['score']}%**"
@@ -150,13 +363,32 @@ if user_input:
     with st.chat_message("assistant"):
         st.markdown(bot_reply)
 
-# Optional: show entire FAQ list
-with st.expander("📖 Show full FAQ list"):
-    for item in faqs:
-        st.markdown(f"**❓ {item['question']}**")
-        st.write(f"➡️ {item['answer']}")
+FAQ_PAGE_SIZE = 20
+
+@st.fragment
+def show_faq_browser(faqs):
+    """Paginated FAQ browser, one page of entries per rerun.
+
+    Runs as a fragment so flipping pages reruns only this block, not the
+    whole script, and render cost stays O(FAQ_PAGE_SIZE) instead of O(N).
+    """
+    last_page = max((len(faqs) - 1) // FAQ_PAGE_SIZE, 0)
+    page = st.number_input("FAQ page", min_value=0, max_value=last_page, value=0)
+    start = page * FAQ_PAGE_SIZE
+    for question, answer in zip(
+        faqs.questions[start:start + FAQ_PAGE_SIZE],
+        faqs.answers[start:start + FAQ_PAGE_SIZE],
+    ):
+        st.markdown(f"**❓ {question}**")
+        st.write(f"➡️ {answer}")
         st.write("---")
 
+# Optional: show entire FAQ list. Opt-in via the sidebar so every chat turn
+# doesn't pay for re-rendering N Markdown blocks the user never opened.
+if show_faq_list:
+    with st.expander("📖 Show full FAQ list"):
+        show_faq_browser(faqs)
+
 # Footer disclaimer
 st.markdown(
     """